@@ -1,10 +1,15 @@
 import yaml
+import asyncio
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 import hmac
-import hashlib
 import base64
 import urllib.parse
 from datetime import datetime, timedelta
@@ -40,13 +45,68 @@ def setup_logger():
 
 logger = setup_logger()
 
+# 缓存有效期(秒)：仓库信息变化较快，头像基本不变
+REPO_CACHE_TTL = 300
+AVATAR_CACHE_TTL = 86400
+
+# received_events只返回约90天内的事件，更早的推送记录可以清理
+PUSHED_RETENTION = 90 * 86400
+PRUNE_INTERVAL = 86400
+
+# 消息中使用的头像尺寸参数，缓存中直接保存带参数的地址
+AVATAR_SIZE_QUERY = "?size=20"
+DEFAULT_AVATAR = "https://github.com/identicons/app.png" + AVATAR_SIZE_QUERY
+
+# 钉钉/飞书机器人限流：每分钟最多20条消息
+WEBHOOK_RATE_LIMIT = 20
+WEBHOOK_RATE_PERIOD = 60
+
+# 请求异常后的重试等待(秒)
+RETRY_DELAY = 60
+
+# Markdown图片语法，使用有界字符类避免回溯
+_IMG_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+
+# SQL语句固定为模块常量，保证命中sqlite3内部的语句缓存
+SQL_LOAD_PUSHED = "SELECT event_id FROM pushed_events"
+SQL_PRUNE_PUSHED = "DELETE FROM pushed_events WHERE pushed_at<?"
+SQL_MARK_PUSHED = "INSERT OR IGNORE INTO pushed_events VALUES (?, ?)"
+SQL_GET_REPO_INFO = (
+    "SELECT description, language, stars, last_updated FROM repo_cache WHERE name=?"
+)
+SQL_CACHE_REPO_INFO = "INSERT OR REPLACE INTO repo_cache VALUES (?, ?, ?, ?, ?)"
+SQL_GET_USER_AVATAR = (
+    "SELECT avatar_url, last_updated FROM user_cache WHERE login=?"
+)
+SQL_CACHE_USER_AVATAR = "INSERT OR REPLACE INTO user_cache VALUES (?, ?, ?)"
+
+
+def _cache_fresh(last_updated, ttl):
+    return datetime.fromisoformat(last_updated) > datetime.now() - timedelta(seconds=ttl)
+
+
+def _cache_timestamp(last_updated):
+    """将数据库中的更新时间换算为time.monotonic()时间点"""
+    age = datetime.now() - datetime.fromisoformat(last_updated)
+    return time.monotonic() - age.total_seconds()
+
 
 class Database:
     def __init__(self):
-        self.conn = sqlite3.connect(config["database"]["path"])
+        self.conn = sqlite3.connect(
+            config["database"]["path"], cached_statements=256
+        )
         self._init_db()
+        self.prune()
 
     def _init_db(self):
+        # WAL模式下写入无需每次fsync，配合批量提交减少磁盘IO
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # 加大页缓存并启用mmap，使几张小表常驻内存
+        self.conn.execute("PRAGMA cache_size=-20000")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS pushed_events (
                 event_id TEXT PRIMARY KEY,
@@ -71,90 +131,240 @@ class Database:
         """)
         self.conn.commit()
 
-    def is_pushed(self, event_id):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT 1 FROM pushed_events WHERE event_id=?", (event_id,))
-        return cursor.fetchone() is not None
+    def prune(self):
+        """清理超出保留期的推送记录，并重新加载已推送事件ID的内存镜像"""
+        cutoff = (datetime.now() - timedelta(seconds=PUSHED_RETENTION)).isoformat()
+        self.conn.execute(SQL_PRUNE_PUSHED, (cutoff,))
+        self.conn.commit()
+        # 去重判断只查内存集合，无需访问SQLite
+        self._pushed = {row[0] for row in self.conn.execute(SQL_LOAD_PUSHED)}
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL
 
-    def mark_pushed(self, event_id):
-        try:
-            self.conn.execute(
-                "INSERT INTO pushed_events VALUES (?, ?)",
-                (event_id, datetime.now().isoformat())
-            )
-            self.conn.commit()
-        except sqlite3.IntegrityError:
-            pass
+    def is_pushed(self, event_id):
+        return event_id in self._pushed
+
+    def mark_pushed_batch(self, event_ids):
+        if not event_ids:
+            return
+        now = datetime.now().isoformat()
+        self.conn.executemany(
+            SQL_MARK_PUSHED,
+            [(event_id, now) for event_id in event_ids]
+        )
+        self._pushed.update(event_ids)
 
     def get_repo_info(self, repo_name):
+        """返回缓存行 (description, language, stars, last_updated)，是否过期由调用方判断"""
         cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT description, language, stars FROM repo_cache WHERE name=?",
-            (repo_name,)
-        )
+        cursor.execute(SQL_GET_REPO_INFO, (repo_name,))
         return cursor.fetchone()
 
     def cache_repo_info(self, repo_name, info):
         self.conn.execute(
-            """INSERT OR REPLACE INTO repo_cache 
-            VALUES (?, ?, ?, ?, ?)""",
+            SQL_CACHE_REPO_INFO,
             (repo_name, info.get("description"),
              info.get("language"), info.get("stargazers_count", 0),
              datetime.now().isoformat())
         )
-        self.conn.commit()
 
     def get_user_avatar(self, login):
+        """返回缓存行 (avatar_url, last_updated)，是否过期由调用方判断"""
         cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT avatar_url FROM user_cache WHERE login=?",
-            (login,)
-        )
-        result = cursor.fetchone()
-        return result[0] if result else None
+        cursor.execute(SQL_GET_USER_AVATAR, (login,))
+        return cursor.fetchone()
 
     def cache_user_avatar(self, login, avatar_url):
         self.conn.execute(
-            """INSERT OR REPLACE INTO user_cache 
-            VALUES (?, ?, ?)""",
+            SQL_CACHE_USER_AVATAR,
             (login, avatar_url, datetime.now().isoformat())
         )
+
+    def flush(self):
+        """提交本轮累积的写入，并按天清理过期推送记录"""
         self.conn.commit()
+        if time.monotonic() >= self._next_prune:
+            self.prune()
 
     def close(self):
+        self.conn.commit()
         self.conn.close()
 
 
+def create_session(headers=None, retry_statuses=(500, 502, 503, 504)):
+    """创建复用连接的HTTP会话，对retry_statuses中的状态码自动重试"""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=retry_statuses
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
 class Notifier:
     def __init__(self):
         self.db = Database()
+        notifications = config["notifications"]
+        self._dingtalk_enabled = notifications["dingtalk"]["enable"]
+        self._dingtalk_bots = notifications["dingtalk"].get("bots", [])
+        self._feishu_enabled = notifications["feishu"]["enable"]
+        self._feishu_bots = notifications["feishu"].get("bots", [])
+        self._github_headers = {"Authorization": f"token {config['github']['token']}"}
+        # GitHub会话携带token；webhook单独使用会话，避免token泄露给第三方
+        # GitHub的429由monitor()按速率限制响应头等待，不在适配器内重试
+        self.github = create_session(self._github_headers)
+        # webhook为POST，urllib3默认不会按状态码重放，避免重复推送，故不配置重试状态码
+        self.http = create_session(retry_statuses=())
+        # 进程内TTL缓存：key -> (time.monotonic()时间点, 值)
+        self._repo_mem = {}
+        self._avatar_mem = {}
+        # 本轮预取失败的URL，同步路径不再重复请求
+        self._prefetch_misses = set()
+        # webhook推送为IO密集型，使用线程池并发发送到各机器人
+        self.pool = ThreadPoolExecutor(max_workers=8)
+        # 令牌桶，只有超出webhook配额时才等待
+        self._bucket = {"tokens": WEBHOOK_RATE_LIMIT, "refill_ts": time.monotonic()}
+        # 事件列表的ETag，未变化时GitHub返回304且不计入速率限制
+        self.last_etag = None
+        # 飞书卡片中固定不变的部分，发送时只填充正文
+        self._feishu_card_skeleton = {
+            "header": {
+                "title": {
+                    "content": "✨ GitHub动态通知",
+                    "tag": "plain_text"
+                },
+                "template": "blue"
+            }
+        }
+        self._prepare_bots()
+
+    def _prepare_bots(self):
+        """启动时预处理机器人配置，避免每次发送重复计算"""
+        for bot in self._dingtalk_bots + self._feishu_bots:
+            if bot.get("secret"):
+                bot["_secret_bytes"] = bot["secret"].encode('utf-8')
+
+        # 飞书签名需改写URL查询参数，预先解析webhook地址
+        for bot in self._feishu_bots:
+            parsed_url = urllib.parse.urlparse(bot["webhook"])
+            bot["_parsed"] = parsed_url
+            bot["_base_query"] = urllib.parse.parse_qs(parsed_url.query)
+
+    def close(self):
+        self.pool.shutdown()
+        self.github.close()
+        self.http.close()
+        self.db.close()
+
+    async def prefetch(self, events):
+        """并发预取本批事件中未缓存的仓库与用户信息，写入数据库缓存"""
+        self._prefetch_misses = set()
+        repo_names, logins = set(), set()
+        for e in events:
+            # 格式异常的事件交给format_message处理，这里直接跳过
+            repo_name = (e.get("repo") or {}).get("name")
+            login = (e.get("actor") or {}).get("login")
+            if repo_name:
+                repo_names.add(repo_name)
+            if login:
+                logins.add(login)
+        # 去重后再检查缓存，每个仓库/用户最多查询一次
+        repos = [name for name in repo_names if not self._repo_cache_fresh(name)]
+        users = [login for login in logins if not self._avatar_cache_fresh(login)]
+        if not repos and not users:
+            return
+
+        async with aiohttp.ClientSession(
+            headers=self._github_headers,
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as session:
+            repo_results = asyncio.gather(*[
+                self._fetch_json(session, f"https://api.github.com/repos/{name}")
+                for name in repos
+            ])
+            user_results = asyncio.gather(*[
+                self._fetch_json(session, f"https://api.github.com/users/{login}")
+                for login in users
+            ])
+            repo_data, user_data = await asyncio.gather(repo_results, user_results)
+
+        for name, data in zip(repos, repo_data):
+            if data is not None:
+                self.db.cache_repo_info(name, data)
+            else:
+                self._prefetch_misses.add(f"https://api.github.com/repos/{name}")
+        for login, data in zip(users, user_data):
+            if data is not None:
+                self.db.cache_user_avatar(login, data.get("avatar_url", ""))
+            else:
+                self._prefetch_misses.add(f"https://api.github.com/users/{login}")
+
+    async def _fetch_json(self, session, url):
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return orjson.loads(await response.read())
+        except Exception as e:
+            logger.warning(f"预取GitHub信息失败 {url}: {e}")
+        return None
+
+    def _repo_cache_fresh(self, repo_name):
+        hit = self._repo_mem.get(repo_name)
+        if hit and time.monotonic() - hit[0] < REPO_CACHE_TTL:
+            return True
+        cached = self.db.get_repo_info(repo_name)
+        return bool(cached) and _cache_fresh(cached[3], REPO_CACHE_TTL)
+
+    def _avatar_cache_fresh(self, login):
+        hit = self._avatar_mem.get(login)
+        if hit and time.monotonic() - hit[0] < AVATAR_CACHE_TTL:
+            return True
+        cached = self.db.get_user_avatar(login)
+        return bool(cached and cached[0]) and _cache_fresh(cached[1], AVATAR_CACHE_TTL)
 
     def _get_repo_details(self, repo_name):
+        hit = self._repo_mem.get(repo_name)
+        if hit and time.monotonic() - hit[0] < REPO_CACHE_TTL:
+            return hit[1]
+
+        # 过期的缓存行保留下来，刷新失败时仍优先展示旧数据
+        stale = None
         cached = self.db.get_repo_info(repo_name)
         if cached:
-            return {
+            info = {
                 "description": cached[0],
                 "language": cached[1],
                 "stargazers_count": cached[2]
             }
+            if _cache_fresh(cached[3], REPO_CACHE_TTL):
+                self._repo_mem[repo_name] = (_cache_timestamp(cached[3]), info)
+                return info
+            stale = info
 
-        try:
-            response = requests.get(
-                f"https://api.github.com/repos/{repo_name}",
-                headers={"Authorization": f"token {config['github']['token']}"},
-                timeout=5
-            )
-            if response.status_code == 200:
-                data = response.json()
-                self.db.cache_repo_info(repo_name, data)
-                return {
-                    "description": data.get("description"),
-                    "language": data.get("language"),
-                    "stargazers_count": data.get("stargazers_count", 0)
-                }
-        except Exception as e:
-            logger.warning(f"获取仓库详情失败: {e}")
+        url = f"https://api.github.com/repos/{repo_name}"
+        if url not in self._prefetch_misses:
+            try:
+                response = self.github.get(url, timeout=5)
+                if response.status_code == 200:
+                    data = orjson.loads(response.content)
+                    self.db.cache_repo_info(repo_name, data)
+                    info = {
+                        "description": data.get("description"),
+                        "language": data.get("language"),
+                        "stargazers_count": data.get("stargazers_count", 0)
+                    }
+                    self._repo_mem[repo_name] = (time.monotonic(), info)
+                    return info
+            except Exception as e:
+                logger.warning(f"获取仓库详情失败: {e}")
 
+        if stale:
+            return stale
         return {
             "description": "暂无描述",
             "language": "",
@@ -162,35 +372,50 @@ class Notifier:
         }
 
     def _get_user_avatar(self, login):
-        cached = self.db.get_user_avatar(login)
-        if cached:
-            return cached
+        hit = self._avatar_mem.get(login)
+        if hit and time.monotonic() - hit[0] < AVATAR_CACHE_TTL:
+            return hit[1]
 
-        try:
-            response = requests.get(
-                f"https://api.github.com/users/{login}",
-                headers={"Authorization": f"token {config['github']['token']}"},
-                timeout=3
-            )
-            if response.status_code == 200:
-                avatar_url = response.json().get("avatar_url", "")
-                self.db.cache_user_avatar(login, avatar_url)
-                return avatar_url
-        except Exception as e:
-            logger.warning(f"获取用户头像失败: {e}")
+        stale = None
+        cached = self.db.get_user_avatar(login)
+        if cached and cached[0]:
+            avatar = cached[0] + AVATAR_SIZE_QUERY
+            if _cache_fresh(cached[1], AVATAR_CACHE_TTL):
+                self._avatar_mem[login] = (_cache_timestamp(cached[1]), avatar)
+                return avatar
+            stale = avatar
+
+        url = f"https://api.github.com/users/{login}"
+        if url not in self._prefetch_misses:
+            try:
+                response = self.github.get(url, timeout=3)
+                if response.status_code == 200:
+                    avatar_url = orjson.loads(response.content).get("avatar_url", "")
+                    self.db.cache_user_avatar(login, avatar_url)
+                    avatar = avatar_url + AVATAR_SIZE_QUERY
+                    if avatar_url:
+                        self._avatar_mem[login] = (time.monotonic(), avatar)
+                    return avatar
+            except Exception as e:
+                logger.warning(f"获取用户头像失败: {e}")
 
-        return "https://github.com/identicons/app.png"
+        return stale or DEFAULT_AVATAR
 
     def format_message(self, event):
         try:
             event_type = event["type"]
             actor = event["actor"]["login"]
-            actor_avatar = self._get_user_avatar(actor) + "?size=20"
+            actor_avatar = self._get_user_avatar(actor)
             repo_name = event["repo"]["name"]
             repo_url = f"https://github.com/{repo_name}"
-            time_str = datetime.strptime(
-                event["created_at"], "%Y-%m-%dT%H:%M:%SZ"
-            ).strftime("%Y-%m-%d %H:%M")
+            # GitHub时间固定为YYYY-MM-DDTHH:MM:SSZ，直接切片即可
+            created_at = event["created_at"]
+            if len(created_at) == 20 and created_at[10] == "T":
+                time_str = created_at[:10] + " " + created_at[11:16]
+            else:
+                time_str = datetime.strptime(
+                    created_at, "%Y-%m-%dT%H:%M:%SZ"
+                ).strftime("%Y-%m-%d %H:%M")
 
             # 获取仓库详情
             repo_info = self._get_repo_details(repo_name)
@@ -216,35 +441,57 @@ class Notifier:
                 tag_name = event["payload"]["release"].get("tag_name", "")
                 release_info = f"\n**版本**: {tag_name} {release_name}"
 
-            return "\n".join([
-                "### ✨ GitHub动态通知",
-                f"![用户头像]({actor_avatar}) **[{actor}](https://github.com/{actor})**",
-                f"**⌚ 时间**: {time_str}",
-                f"**🔧 操作**: {actions.get(event_type, event_type)}",
-                f"**📦 仓库**: [{repo_name}]({repo_url})",
-                f"**📝 描述**: {description}{release_info}",
-                f"**🌐 语言**: {language} | **⭐ Stars**: {stars}",
+            return (
+                "### ✨ GitHub动态通知\n"
+                f"![用户头像]({actor_avatar}) **[{actor}](https://github.com/{actor})**\n"
+                f"**⌚ 时间**: {time_str}\n"
+                f"**🔧 操作**: {actions.get(event_type, event_type)}\n"
+                f"**📦 仓库**: [{repo_name}]({repo_url})\n"
+                f"**📝 描述**: {description}{release_info}\n"
+                f"**🌐 语言**: {language} | **⭐ Stars**: {stars}\n"
                 "---"
-            ])
+            )
 
         except Exception as e:
             logger.error(f"格式化消息失败: {e}")
-            return "\n".join([
-                "### GitHub动态通知",
-                "**警告**: 消息格式化出错",
+            return (
+                "### GitHub动态通知\n"
+                "**警告**: 消息格式化出错\n"
                 f"```\n{str(e)}\n```"
-            ])
+            )
+
+    def _acquire(self):
+        """从令牌桶取一个令牌，桶空时等待到下一个令牌生成"""
+        bucket = self._bucket
+        rate = WEBHOOK_RATE_LIMIT / WEBHOOK_RATE_PERIOD
+        now = time.monotonic()
+        bucket["tokens"] = min(
+            WEBHOOK_RATE_LIMIT,
+            bucket["tokens"] + (now - bucket["refill_ts"]) * rate
+        )
+        bucket["refill_ts"] = now
+        if bucket["tokens"] < 1:
+            time.sleep((1 - bucket["tokens"]) / rate)
+            bucket["tokens"] = 1
+            bucket["refill_ts"] = time.monotonic()
+        bucket["tokens"] -= 1
 
     def send_all(self, message):
+        # 每条消息会发送到所有机器人，因此一个令牌对应每个机器人的一条配额
+        self._acquire()
+        futures = []
+
         # 发送到所有钉钉机器人
-        if config["notifications"]["dingtalk"]["enable"]:
-            for bot in config["notifications"]["dingtalk"].get("bots", []):
-                self._send_dingtalk(message, bot)
+        if self._dingtalk_enabled:
+            for bot in self._dingtalk_bots:
+                futures.append(self.pool.submit(self._send_dingtalk, message, bot))
 
         # 发送到所有飞书机器人
-        if config["notifications"]["feishu"]["enable"]:
-            for bot in config["notifications"]["feishu"].get("bots", []):
-                self._send_feishu(message, bot)
+        if self._feishu_enabled:
+            for bot in self._feishu_bots:
+                futures.append(self.pool.submit(self._send_feishu, message, bot))
+
+        wait(futures)
 
     def _send_dingtalk(self, message, bot_config):
         try:
@@ -258,10 +505,15 @@ class Notifier:
             url = bot_config["webhook"]
             if bot_config.get("secret"):
                 timestamp = str(round(time.time() * 1000))
-                sign = self._generate_dingtalk_sign(bot_config["secret"], timestamp)
+                sign = self._generate_dingtalk_sign(bot_config, timestamp)
                 url += f"&timestamp={timestamp}&sign={sign}"
 
-            response = requests.post(url, json=payload, timeout=5)
+            response = self.http.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=5
+            )
             if response.status_code != 200:
                 logger.error(f"钉钉发送失败到 {bot_config.get('name', '未知机器人')}: {response.text}")
             else:
@@ -277,13 +529,7 @@ class Notifier:
             payload = {
                 "msg_type": "interactive",
                 "card": {
-                    "header": {
-                        "title": {
-                            "content": "✨ GitHub动态通知",
-                            "tag": "plain_text"
-                        },
-                        "template": "blue"
-                    },
+                    **self._feishu_card_skeleton,
                     "elements": [{
                         "tag": "div",
                         "text": {
@@ -297,24 +543,23 @@ class Notifier:
             # 处理签名逻辑
             if bot_config.get("secret"):
                 timestamp = str(int(time.time()))  # 秒级时间戳
-                sign = self._generate_feishu_sign(bot_config["secret"], timestamp)
+                sign = self._generate_feishu_sign(bot_config, timestamp)
 
                 # 将签名参数添加到URL中
-                parsed_url = urllib.parse.urlparse(webhook_url)
-                query = urllib.parse.parse_qs(parsed_url.query)
+                query = dict(bot_config["_base_query"])
                 query.update({
                     "timestamp": [timestamp],
                     "sign": [sign]
                 })
                 new_query = urllib.parse.urlencode(query, doseq=True)
                 webhook_url = urllib.parse.urlunparse(
-                    parsed_url._replace(query=new_query)
+                    bot_config["_parsed"]._replace(query=new_query)
                 )
 
             # 发送请求
-            response = requests.post(
+            response = self.http.post(
                 webhook_url,
-                json=payload,
+                data=orjson.dumps(payload),
                 headers={"Content-Type": "application/json"},
                 timeout=10
             )
@@ -322,7 +567,7 @@ class Notifier:
             if response.status_code != 200:
                 error_msg = f"飞书推送失败到 {bot_config.get('name', '未知机器人')}: {response.status_code}"
                 try:
-                    error_detail = response.json()
+                    error_detail = orjson.loads(response.content)
                     error_msg += f" | 错误码: {error_detail.get('code')} | 消息: {error_detail.get('msg')}"
                 except:
                     error_msg += f" | 响应: {response.text}"
@@ -333,84 +578,128 @@ class Notifier:
         except Exception as e:
             logger.error(f"飞书发送异常到 {bot_config.get('name', '未知机器人')}: {str(e)}")
 
-    def _generate_dingtalk_sign(self, secret, timestamp):
+    def _generate_dingtalk_sign(self, bot_config, timestamp):
         """钉钉签名生成方法"""
-        string_to_sign = f"{timestamp}\n{secret}"
-        hmac_code = hmac.new(
-            secret.encode('utf-8'),
+        string_to_sign = f"{timestamp}\n{bot_config['secret']}"
+        hmac_code = hmac.digest(
+            bot_config["_secret_bytes"],
             string_to_sign.encode('utf-8'),
-            digestmod=hashlib.sha256
-        ).digest()
+            'sha256'
+        )
         return urllib.parse.quote_plus(base64.b64encode(hmac_code))
 
-    def _generate_feishu_sign(self, secret, timestamp):
+    def _generate_feishu_sign(self, bot_config, timestamp):
         """飞书签名生成方法"""
-        string_to_sign = f"{timestamp}\n{secret}".encode('utf-8')
-        hmac_code = hmac.new(
-            secret.encode('utf-8'),
+        string_to_sign = f"{timestamp}\n{bot_config['secret']}".encode('utf-8')
+        hmac_code = hmac.digest(
+            bot_config["_secret_bytes"],
             string_to_sign,
-            digestmod=hashlib.sha256
-        ).digest()
+            'sha256'
+        )
         return base64.b64encode(hmac_code).decode('utf-8')
 
     def _format_for_feishu(self, message):
         """飞书专用格式化"""
         try:
-            # 1. 转换图片语法（如果存在）
-            if '![' in message and '](' in message:
-                message = re.sub(r'!\[.*?\]\(.*?\)', '', message)
-
-            # 2. 简化标题格式
-            message = message.replace("### ✨ GitHub动态通知\n", "")
-
-            # 3. 确保双换行
-            message = message.replace("\n", "\n\n")
-
-            return message
+            # 去除图片语法、简化标题格式、确保双换行
+            return _IMG_RE.sub('', message).replace(
+                "### ✨ GitHub动态通知\n", ""
+            ).replace("\n", "\n\n")
         except Exception as e:
             logger.error(f"飞书消息格式化异常: {e}")
             return "GitHub动态通知（消息格式化出错）"
 
 
+def _rate_limit_delay(response):
+    """GitHub限流时返回需要等待的秒数，未限流返回None"""
+    if response.status_code not in (403, 429):
+        return None
+    # 次级限流会给出Retry-After
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        return int(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = int(response.headers.get("X-RateLimit-Reset", 0))
+        return max(reset - time.time(), 0) + 1
+    return None
+
+
+def _sleep_until(deadline):
+    time.sleep(max(0, deadline - time.monotonic()))
+
+
 def monitor():
     notifier = Notifier()
     logger.info("🚀 GitHub监控启动")
 
+    events_url = f"https://api.github.com/users/{config['github']['username']}/received_events"
+    per_page = config["github"]["max_events"]
+    poll_interval = config["github"]["poll_interval"]
+
     try:
         while True:
+            # 以本轮开始时间计算下一轮，处理耗时不再累积成漂移
+            next_tick = time.monotonic() + poll_interval
             try:
                 # 获取事件
-                events = requests.get(
-                    f"https://api.github.com/users/{config['github']['username']}/received_events",
-                    headers={"Authorization": f"token {config['github']['token']}"},
-                    params={"per_page": config["github"]["max_events"]},
+                headers = {}
+                if notifier.last_etag:
+                    headers["If-None-Match"] = notifier.last_etag
+                response = notifier.github.get(
+                    events_url,
+                    params={"per_page": per_page},
+                    headers=headers,
                     timeout=10
-                ).json()
+                )
+                if response.status_code == 304:
+                    logger.info("本轮检查完成，事件无变化")
+                    _sleep_until(next_tick)
+                    continue
+                delay = _rate_limit_delay(response)
+                if delay is not None:
+                    logger.warning(f"触发GitHub速率限制，{delay:.0f}秒后重试")
+                    time.sleep(delay)
+                    continue
+                response.raise_for_status()
+                events = orjson.loads(response.content)
+
+                # 并发预取未缓存的仓库/用户信息，后续格式化直接命中缓存
+                pending = [e for e in events if not notifier.db.is_pushed(e["id"])]
+                if pending:
+                    asyncio.run(notifier.prefetch(pending))
 
                 # 处理事件
-                new_events = 0
-                for event in events:
-                    if not notifier.db.is_pushed(event["id"]):
-                        msg = notifier.format_message(event)
-                        notifier.send_all(msg)
-                        notifier.db.mark_pushed(event["id"])
-                        new_events += 1
-                        time.sleep(0.5)
-
-                logger.info(f"本轮检查完成，发现{new_events}个新事件")
-                time.sleep(config["github"]["poll_interval"])
+                # 同一批次内重复的事件ID也只推送一次
+                pushed_ids = set()
+                try:
+                    for event in events:
+                        event_id = event["id"]
+                        if event_id not in pushed_ids and not notifier.db.is_pushed(event_id):
+                            msg = notifier.format_message(event)
+                            notifier.send_all(msg)
+                            pushed_ids.add(event_id)
+                finally:
+                    # 每轮只写入并提交一次；异常时也要保留已推送的记录
+                    notifier.db.mark_pushed_batch(pushed_ids)
+                    notifier.db.flush()
+
+                # 全部处理完才记录ETag，避免中途失败的事件被304跳过
+                if response.status_code == 200:
+                    notifier.last_etag = response.headers.get("ETag")
+                logger.info(f"本轮检查完成，发现{len(pushed_ids)}个新事件")
+                _sleep_until(next_tick)
 
             except requests.exceptions.RequestException as e:
                 logger.error(f"网络请求异常: {e}")
-                time.sleep(60)
+                time.sleep(RETRY_DELAY)
             except Exception as e:
                 logger.error(f"处理异常: {e}")
-                time.sleep(60)
+                time.sleep(RETRY_DELAY)
 
     except KeyboardInterrupt:
         logger.info("🛑 手动停止监控")
     finally:
-        notifier.db.close()
+        notifier.close()
 
 
 if __name__ == "__main__":